@@ -17,6 +17,7 @@ from gym_miniworld.envs.simtorealgoto import SimToRealGoTo
 from gym_miniworld.envs.simtorealpush import SimToRealPush
 from gym_miniworld.envs.threerooms import ThreeRooms
 from gym_miniworld.envs.tmaze import TMaze, TMazeLeft, TMazeRight
+from gym_miniworld.envs.vec_hallway import VectorHallway
 from gym_miniworld.envs.wallgap import WallGap
 from gym_miniworld.envs.ymaze import YMaze, YMazeLeft, YMazeRight
 
@@ -43,6 +44,10 @@ def register_envs():
         if env_class is MiniWorldEnv:
             continue
 
+        # Vector environments are created directly, not through gym.make
+        if issubclass(env_class, gym.vector.VectorEnv):
+            continue
+
         # Register the environment with OpenAI Gym
         gym_id = f"MiniWorld-{global_name}-v0"
         entry_point = f"{module_name}:{global_name}"
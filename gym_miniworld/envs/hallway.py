@@ -49,9 +49,12 @@ class Hallway(MiniWorldEnv):
         # Allow only movement actions (left/right/forward)
         self.action_space = spaces.Discrete(self.actions.move_forward + 1)
 
-    def _gen_world(self):
+    def _gen_static_world(self):
         # Create a long rectangular room
-        room = self.add_rect_room(min_x=-1, max_x=-1 + self.length, min_z=-2, max_z=2)
+        self.add_rect_room(min_x=-1, max_x=-1 + self.length, min_z=-2, max_z=2)
+
+    def _gen_dynamic_world(self):
+        room = self.rooms[0]
 
         # Place the box at the end of the hallway
         self.box = self.place_entity(Box(color="red"), min_x=room.max_x - 2)
@@ -61,10 +64,20 @@ class Hallway(MiniWorldEnv):
             dir=self.np_random.uniform(-math.pi / 4, math.pi / 4), max_x=room.max_x - 2
         )
 
+        # The agent can only be near the box (see MiniWorldEnv.near)
+        # once it has moved past this x coordinate
+        near_dist = (
+            self.box.radius
+            + self.agent.radius
+            + 1.1 * self.params.get_max("forward_step")
+        )
+        self.near_min_x = self.box.pos[0] - near_dist
+
     def step(self, action):
         obs, reward, termination, truncation, info = super().step(action)
 
-        if self.near(self.box):
+        # Cheap test on the x coordinate first, the box is at the end
+        if self.agent.pos[0] > self.near_min_x and self.near(self.box):
             reward += self._reward()
             termination = True
 
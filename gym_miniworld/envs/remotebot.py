@@ -1,20 +1,23 @@
 #!/usr/bin/env python
 
-import math
+import json
+import os
+import threading
+from collections import deque
+from ctypes import POINTER
 from typing import Optional
 
 import gymnasium as gym
-import numpy
 import numpy as np
 import pyglet
 from gymnasium import spaces
-
-# Try importing ZMQ
 from pyglet.gl import (
     GL_FRAMEBUFFER,
     GL_MODELVIEW,
     GL_PROJECTION,
+    GLubyte,
     glBindFramebuffer,
+    glBindTexture,
     glLoadIdentity,
     glMatrixMode,
     glOrtho,
@@ -23,12 +26,57 @@ from pyglet.gl import (
 
 from gym_miniworld.miniworld import MiniWorldEnv
 
+# Try importing ZMQ
 try:
     import zmq
 except ImportError:
     zmq = None
 
-buffer = memoryview
+# Try importing msgspec, used to decode the msgpack frame headers
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Try importing orjson, which encodes and decodes JSON faster than
+# the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Try importing PyTurboJPEG and lz4, used to decompress frames
+try:
+    import turbojpeg
+except ImportError:
+    turbojpeg = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Decoder for the msgpack frame headers
+_hdr_dec = msgspec.msgpack.Decoder() if msgspec is not None else None
+
+# JPEG decoder, created when first needed
+_jpeg = None
+
+
+def _jpeg_decoder():
+    global _jpeg
+    if _jpeg is None:
+        _jpeg = turbojpeg.TurboJPEG()
+    return _jpeg
+
+
+def _json_dumps(obj):
+    return json.dumps(obj).encode()
+
+
+# JSON encoding/decoding of commands and legacy frame headers
+json_dumps = orjson.dumps if orjson is not None else _json_dumps
+json_loads = orjson.loads if orjson is not None else json.loads
 
 # Rendering window size
 WINDOW_WIDTH = 800
@@ -37,17 +85,53 @@ WINDOW_HEIGHT = 600
 # Port to connect to on the server
 SERVER_PORT = 7777
 
+# Number of camera frames buffered by the receiver thread
+FRAME_BUFFER_LEN = 4
+
 
 def recv_array(socket):
     """
-    Receive a numpy array over zmq
+    Receive a read-only uint8 numpy array (camera image) over zmq
+
+    The server sends a two-part message made of a msgpack header and the
+    array data. Older servers send a JSON header and the array data as two
+    separate messages, which is still supported.
+
+    The array data may be compressed, as given by the "codec" header field:
+    "jpeg" (lossy) or "lz4" (lossless). Otherwise it is sent raw.
     """
 
-    md = socket.recv_json()
-    msg = socket.recv(copy=True, track=False)
-    buf = buffer(msg)
-    A = numpy.frombuffer(buf, dtype=md["dtype"])
+    # Receive the message parts as zmq.Frame objects, whose buffers are
+    # zero-copy views into the message data owned by zmq
+    parts = socket.recv_multipart(copy=False, track=False)
+
+    if len(parts) == 2:
+        assert msgspec is not None, "Please install msgspec (pip3 install msgspec)"
+        md = _hdr_dec.decode(parts[0].buffer)
+        msg = parts[1]
+    else:
+        md = json_loads(parts[0].bytes)
+        msg = socket.recv(copy=False, track=False)
+
+    # Images are sent as uint8 pixels, not float, to keep frames small
+    assert np.dtype(md["dtype"]) == np.uint8, "frames must be sent as uint8"
+
+    codec = md.get("codec", "raw")
+    if codec == "jpeg":
+        assert (
+            turbojpeg is not None
+        ), "Please install PyTurboJPEG (pip3 install PyTurboJPEG)"
+        A = _jpeg_decoder().decode(msg.buffer, pixel_format=turbojpeg.TJPF_RGB)
+    elif codec == "lz4":
+        assert lz4 is not None, "Please install lz4 (pip3 install lz4)"
+        A = np.frombuffer(lz4.frame.decompress(msg.buffer), dtype=np.uint8)
+    else:
+        assert codec == "raw", f"unknown frame codec {codec}"
+        A = np.frombuffer(msg.buffer, dtype=np.uint8)
+
+    # Frames are shared with the receive buffer, so they must not be modified
     A = A.reshape(md["shape"])
+    A.flags.writeable = False
     return A
 
 
@@ -71,6 +155,8 @@ class RemoteBot(gym.Env):
         obs_width=80,
         obs_height=60,
         render_mode=None,
+        codec=None,
+        pin_recv_thread=False,
     ):
         assert zmq is not None, "Please install zmq (pip3 install zmq)"
 
@@ -80,6 +166,11 @@ class RemoteBot(gym.Env):
         # Actions are discrete integer values
         self.action_space = spaces.Discrete(len(self.actions))
 
+        # Encoded command messages for each action, indexed by action value
+        self.action_payloads = tuple(
+            json_dumps({"command": "action", "action": a.name}) for a in self.actions
+        )
+
         # We observe an RGB image with pixels in [0, 255]
         self.observation_space = spaces.Box(
             low=0, high=255, shape=(obs_height, obs_width, 3), dtype=np.uint8
@@ -88,78 +179,241 @@ class RemoteBot(gym.Env):
         self.obs_width = obs_width
         self.obs_height = obs_height
 
-        self.reward_range = (0, 1)
+        # Compression requested for the camera frames ("jpeg" or "lz4"),
+        # None to receive raw frames
+        assert codec in [None, "jpeg", "lz4"]
+        if codec == "jpeg":
+            assert (
+                turbojpeg is not None
+            ), "Please install PyTurboJPEG (pip3 install PyTurboJPEG)"
+            # Load the libjpeg-turbo library now rather than in the
+            # receiver thread, so that a missing library is reported here
+            _jpeg_decoder()
+        if codec == "lz4":
+            assert lz4 is not None, "Please install lz4 (pip3 install lz4)"
+        self.codec = codec
 
-        # Environment configuration
-        self.max_episode_steps = math.inf
+        self.reward_range = (0, 1)
 
         # For rendering
         self.window = None
         self.render_mode = render_mode
 
         # We continually stream in images and then just take the latest one.
-        self.latest_img = None
-
-        # For displaying text
-        import pyglet
+        # Frames are received by a background thread and buffered here,
+        # frame_count is the total number of frames received so far
+        self.frames = deque(maxlen=FRAME_BUFFER_LEN)
+        self.frame_count = 0
+        self.frame_cond = threading.Condition()
+
+        # Exception raised in the receiver thread, if any, which is
+        # re-raised in the calling thread instead of waiting forever
+        self.recv_error = None
+
+        # Latest camera image, returned as the observation. It is a
+        # read-only view of the received frame, which is never overwritten.
+        self.img = None
+
+        # CPU core the receiver thread is pinned to, if any, and the cores
+        # the calling thread could run on before, see _pin_recv_thread
+        self.recv_cpu = None
+        self.saved_affinity = None
+
+        self.recv_thread = None
+
+        self.context = zmq.Context()
+        # Don't wait for unsent commands when closing, e.g. if the
+        # server is gone
+        self.context.setsockopt(zmq.LINGER, 0)
+
+        # Anything failing from here on must close the environment, to
+        # release the sockets and restore the CPU affinity
+        try:
+            if pin_recv_thread:
+                self._pin_recv_thread()
+
+            # Connect to the Gym bridge ROS node
+            addr_str = f"tcp://{serverAddr}:{serverPort}"
+            print("Connecting to %s ..." % addr_str)
+            self.socket = self.context.socket(zmq.PAIR)
+            self.socket.connect(addr_str)
+
+            # zmq sockets can't be shared between threads. The receiver thread
+            # owns the server socket, and commands are forwarded to it through
+            # an inproc pipe.
+            pipe_addr = f"inproc://remotebot-{id(self)}"
+            self.cmd_pipe = self.context.socket(zmq.PAIR)
+            self.cmd_pipe.bind(pipe_addr)
+            self.cmd_pipe_thread = self.context.socket(zmq.PAIR)
+            self.cmd_pipe_thread.connect(pipe_addr)
+
+            # Start receiving camera frames in the background
+            self.stop_event = threading.Event()
+            self.recv_thread = threading.Thread(target=self._recv_loop, daemon=True)
+            self.recv_thread.start()
+
+            # Initialize the state
+            self.reset()
+        except Exception:
+            self.close()
+            raise
 
-        self.textLabel = pyglet.text.Label(
-            font_name="Arial", font_size=14, x=5, y=WINDOW_HEIGHT - 19
-        )
-
-        # Connect to the Gym bridge ROS node
-        addr_str = f"tcp://{serverAddr}:{serverPort}"
-        print("Connecting to %s ..." % addr_str)
-        context = zmq.Context()
-        self.socket = context.socket(zmq.PAIR)
-        self.socket.connect(addr_str)
-
-        # Initialize the state
-        self.reset()
         print("Connected")
 
     def close(self):
         if self.window:
             self.window.close()
+
+        # Stop the receiver thread, which closes the server socket
+        if self.recv_thread is not None:
+            self.stop_event.set()
+            self.recv_thread.join()
+            self.recv_thread = None
+
+        # Close the sockets still open and the context
+        self.context.destroy()
+
+        # Give the calling thread back the cores it could run on before
+        if self.saved_affinity is not None:
+            os.sched_setaffinity(0, self.saved_affinity)
+            self.saved_affinity = None
         return
 
-    def _recv_frame(self):
-        # Receive a camera image from the server
-        img = recv_array(self.socket)
+    def _pin_recv_thread(self):
+        """
+        Dedicate a CPU core to receiving camera frames (Linux only), so that
+        it doesn't compete with the policy and rendering code. The receiver
+        thread and the zmq I/O thread, which does the actual network reads,
+        run on the last core. The calling thread is pinned to the remaining
+        cores until the environment is closed.
+        """
+
+        assert hasattr(
+            os, "sched_setaffinity"
+        ), "pinning the receiver thread is only supported on Linux"
+
+        cpus = sorted(os.sched_getaffinity(0))
+        if len(cpus) < 2:
+            gym.logger.warn(
+                "Only one CPU core available, not pinning the receiver thread"
+            )
+            return
 
-        self.img = img
+        self.recv_cpu = cpus[-1]
+
+        # Must be set before the first socket is created, which starts
+        # the zmq I/O thread. Requires libzmq 4.3 or later.
+        if hasattr(zmq, "THREAD_AFFINITY_CPU_ADD"):
+            self.context.set(zmq.THREAD_AFFINITY_CPU_ADD, self.recv_cpu)
+        else:
+            gym.logger.warn("libzmq is too old to pin its I/O thread")
+
+        self.saved_affinity = cpus
+        os.sched_setaffinity(0, cpus[:-1])
+
+    def _recv_loop(self):
+        """
+        Forward commands to the server and receive camera frames,
+        runs in the receiver thread
+        """
+
+        try:
+            if self.recv_cpu is not None:
+                self._set_recv_thread_sched()
+
+            poller = zmq.Poller()
+            poller.register(self.socket, zmq.POLLIN)
+            poller.register(self.cmd_pipe_thread, zmq.POLLIN)
+
+            while not self.stop_event.is_set():
+                events = dict(poller.poll(100))
+
+                if self.cmd_pipe_thread in events:
+                    msg = self.cmd_pipe_thread.recv(copy=False)
+                    self.socket.send(msg, copy=False)
+
+                if self.socket in events:
+                    img = recv_array(self.socket)
+
+                    with self.frame_cond:
+                        self.frames.append(img)
+                        self.frame_count += 1
+                        self.frame_cond.notify_all()
+
+        except Exception as e:
+            # Wake up the calling thread so that it can raise the error
+            with self.frame_cond:
+                self.recv_error = e
+                self.frame_cond.notify_all()
+
+        finally:
+            self.cmd_pipe_thread.close()
+            self.socket.close()
+
+    def _set_recv_thread_sched(self):
+        """
+        Pin the receiver thread to its CPU core and try to give it real-time
+        (SCHED_FIFO) priority, to reduce frame latency jitter. Real-time
+        priority requires root or the CAP_SYS_NICE capability.
+        """
+
+        os.sched_setaffinity(0, [self.recv_cpu])
+
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+        except PermissionError:
+            gym.logger.warn(
+                "Could not set real-time priority for the receiver thread, "
+                "this requires the CAP_SYS_NICE capability"
+            )
+
+    def _wait_frames(self, frame_count):
+        # Wait until frame_count frames have been received in total, or the
+        # receiver thread has failed. Must be called with frame_cond held.
+        self.frame_cond.wait_for(
+            lambda: self.frame_count >= frame_count or self.recv_error is not None
+        )
+        if self.frame_count < frame_count:
+            raise self.recv_error
+
+    def _recv_frame(self, frame_count):
+        # Wait for a camera image received after the last command was sent,
+        # frame_count is the number of frames received before sending it
+        with self.frame_cond:
+            self._wait_frames(frame_count + 1)
+            self.img = self.frames[-1]
 
     def reset(
         self,
         seed: Optional[int] = None,
         options: Optional[dict] = None,
     ):
-        # Step count since episode start
-        self.step_count = 0
-
-        self.socket.send_json(
-            {
-                "command": "reset",
-                "obs_width": self.obs_width,
-                "obs_height": self.obs_height,
-            }
-        )
+        reset_cmd = {
+            "command": "reset",
+            "obs_width": self.obs_width,
+            "obs_height": self.obs_height,
+        }
+        if self.codec is not None:
+            reset_cmd["codec"] = self.codec
+
+        frame_count = self.frame_count
+        self.cmd_pipe.send(json_dumps(reset_cmd))
 
         # Receive a camera image from the server
-        self._recv_frame()
+        self._recv_frame(frame_count)
 
         return self.img, {}
 
     def step(self, action):
+        # Negative indices would silently select another action's payload
+        assert 0 <= action < len(self.action_payloads), f"invalid action {action}"
+
         # Send the action to the server
-        self.socket.send_json(
-            {"command": "action", "action": RemoteBot.Actions(action).name}
-        )
+        frame_count = self.frame_count
+        self.cmd_pipe.send(self.action_payloads[action])
 
         # Receive a camera image from the server
-        self._recv_frame()
-
-        self.step_count += 1
+        self._recv_frame(frame_count)
 
         # We don't care about rewards or episodes since we're not training
         reward = 0
@@ -168,6 +422,40 @@ class RemoteBot(gym.Env):
 
         return self.img, reward, termination, truncation, {}
 
+    def step_batch(self, actions):
+        """
+        Perform multiple actions in a row. The actions are sent to the
+        server before the camera images are received, so that the network
+        round-trip latency is paid once per FRAME_BUFFER_LEN actions instead
+        of once per action. Returns the images received after each of the
+        actions, as an array of shape (len(actions), obs_height, obs_width, 3).
+        """
+
+        for action in actions:
+            assert 0 <= action < len(self.action_payloads), f"invalid action {action}"
+
+        obs = np.empty((len(actions),) + self.observation_space.shape, dtype=np.uint8)
+
+        # Never have more actions in flight than the frame buffer can hold,
+        # otherwise images would be dropped before we get to read them
+        for start in range(0, len(actions), self.frames.maxlen):
+            chunk = actions[start : start + self.frames.maxlen]
+
+            # Send the actions to the server
+            frame_count = self.frame_count
+            for action in chunk:
+                self.cmd_pipe.send(self.action_payloads[action])
+
+            # Receive the camera images, in order
+            with self.frame_cond:
+                self._wait_frames(frame_count + len(chunk))
+                frames = list(self.frames)[-len(chunk) :]
+
+            obs[start : start + len(chunk)] = frames
+            self.img = frames[-1]
+
+        return obs
+
     def render(self):
         if self.render_mode is None:
             gym.logger.warn(
@@ -181,9 +469,18 @@ class RemoteBot(gym.Env):
             return self.img
 
         if self.window is None:
-            pyglet.gl.get_current_context()
             self.window = pyglet.window.Window(width=WINDOW_WIDTH, height=WINDOW_HEIGHT)
 
+            # Image data and texture reused to stream in the camera frames
+            self.img_data = pyglet.image.ImageData(
+                self.obs_width,
+                self.obs_height,
+                "RGB",
+                bytes(self.obs_width * self.obs_height * 3),
+                pitch=self.obs_width * 3,
+            )
+            self.img_tex = self.img_data.get_texture()
+
         self.window.switch_to()
 
         glBindFramebuffer(GL_FRAMEBUFFER, 0)
@@ -199,18 +496,18 @@ class RemoteBot(gym.Env):
         glOrtho(0, WINDOW_WIDTH, 0, WINDOW_HEIGHT, 0, 10)
 
         # Draw the image to the rendering window
-        img = np.ascontiguousarray(np.flip(self.img, axis=0))
-        width = img.shape[1]
-        height = img.shape[0]
-        imgData = pyglet.image.ImageData(
-            width,
-            height,
-            "RGB",
-            img.tobytes(),
-            # self.img.ctypes.data_as(POINTER(GLubyte)),
-            pitch=width * 3,
+        # The image rows are stored top to bottom, so instead of flipping
+        # the pixel data, the quad is drawn with a negative height
+        # The frame is uploaded into the existing texture (glTexSubImage2D)
+        # rather than allocating a new texture for every frame
+        self.img_data.set_data(
+            "RGB", self.obs_width * 3, self.img.ctypes.data_as(POINTER(GLubyte))
+        )
+        glBindTexture(self.img_tex.target, self.img_tex.id)
+        self.img_data.blit_to_texture(
+            self.img_tex.target, self.img_tex.level, self.img_tex.x, self.img_tex.y, 0
         )
-        imgData.blit(0, 0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.img_tex.blit(0, WINDOW_HEIGHT, 0, WINDOW_WIDTH, -WINDOW_HEIGHT)
 
         # If we are not running the Pyglet event loop,
         # we have to manually flip the buffers and dispatch events
@@ -18,6 +18,25 @@ sim_params.set("cam_fwd_disp", 0, -0.02, 0.02)
 
 # TODO: modify lighting parameters
 
+# Textures randomly chosen for the floor and walls
+FLOOR_TEX = (
+    "cardboard",
+    "wood",
+    "wood_planks",
+)
+
+WALL_TEX = (
+    "drywall",
+    "stucco",
+    "cardboard",
+    # Chosen because they have visible lines/seams
+    "concrete_tiles",
+    "ceiling_tiles",
+)
+
+# Textures loaded when the environment is created
+PRELOAD_TEX = sorted(set(FLOOR_TEX + WALL_TEX))
+
 
 class SimToRealGoTo(MiniWorldEnv):
     """
@@ -51,6 +70,9 @@ class SimToRealGoTo(MiniWorldEnv):
 
     """
 
+    # Load all the randomized textures before the first reset
+    preload_tex = PRELOAD_TEX
+
     def __init__(self, **kwargs):
         super().__init__(
             max_episode_steps=100, params=sim_params, domain_rand=True, **kwargs
@@ -60,34 +82,17 @@ class SimToRealGoTo(MiniWorldEnv):
         self.action_space = spaces.Discrete(self.actions.move_forward + 1)
 
     def _gen_world(self):
-        # 1-2 meter wide rink
-        size = self.np_random.uniform(1, 2)
-
-        wall_height = self.np_random.uniform(0.20, 0.50)
-
-        box_size = self.np_random.uniform(0.07, 0.12)
+        # 1-2 meter wide rink, wall height and box size, sampled together
+        size, wall_height, box_size = self.np_random.uniform(
+            low=[1, 0.20, 0.07], high=[2, 0.50, 0.12]
+        ).tolist()
 
         self.agent.radius = 0.11
 
         # Randomly choosing floor_tex and wall_tex
-        floor_tex_list = [
-            "cardboard",
-            "wood",
-            "wood_planks",
-        ]
-
-        wall_tex_list = [
-            "drywall",
-            "stucco",
-            "cardboard",
-            # Chosen because they have visible lines/seams
-            "concrete_tiles",
-            "ceiling_tiles",
-        ]
-
-        floor_tex = self.np_random.choice(floor_tex_list)
-
-        wall_tex = self.np_random.choice(wall_tex_list)
+        floor_idx, wall_idx = self.np_random.integers([len(FLOOR_TEX), len(WALL_TEX)])
+        floor_tex = FLOOR_TEX[floor_idx]
+        wall_tex = WALL_TEX[wall_idx]
 
         # Create a long rectangular room
         self.add_rect_room(
@@ -4,6 +4,7 @@ import numpy as np
 from gymnasium import spaces
 
 from gym_miniworld.entity import Box
+from gym_miniworld.envs.simtorealgoto import FLOOR_TEX, WALL_TEX
 from gym_miniworld.miniworld import MiniWorldEnv
 from gym_miniworld.params import DEFAULT_PARAMS
 
@@ -74,23 +75,9 @@ class SimToRealPush(MiniWorldEnv):
         self.agent.radius = 0.11
 
         # Randomly choosing floor_tex and wall_tex
-        floor_tex_list = [
-            "cardboard",
-            "wood",
-            "wood_planks",
-        ]
-
-        wall_tex_list = [
-            "drywall",
-            "stucco",
-            "cardboard",
-            # Chosen because they have visible lines/seams
-            "concrete_tiles",
-            "ceiling_tiles",
-        ]
-        floor_tex = self.np_random.choice(floor_tex_list)
-
-        wall_tex = self.np_random.choice(wall_tex_list)
+        floor_idx, wall_idx = self.np_random.integers([len(FLOOR_TEX), len(WALL_TEX)])
+        floor_tex = FLOOR_TEX[floor_idx]
+        wall_tex = WALL_TEX[wall_idx]
 
         # Create a long rectangular room
         self.add_rect_room(
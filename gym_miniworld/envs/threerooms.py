@@ -1,10 +1,34 @@
 import math
 
+import numpy as np
 from gymnasium import spaces
 
 from gym_miniworld.entity import Ball, Box, ImageFrame, Key, MeshEnt
 from gym_miniworld.miniworld import MiniWorldEnv
 
+# Room extents, one row (min_x, max_x, min_z, max_z) per room
+ROOMS_DESC = np.array(
+    [
+        # Top room
+        [-7, 7, 0.5, 7],
+        # Bottom-left room
+        [-7, -1, -7, -0.5],
+        # Bottom-right room
+        [1, 7, -7, -0.5],
+    ],
+    dtype=float,
+)
+
+# Portals/openings connecting the rooms,
+# one row (room_a, room_b, min_x, max_x) per portal
+PORTALS_DESC = np.array(
+    [
+        [0, 1, -5.25, -2.75],
+        [0, 2, 2.75, 5.25],
+    ],
+    dtype=float,
+)
+
 
 class ThreeRooms(MiniWorldEnv):
     """
@@ -43,21 +67,11 @@ class ThreeRooms(MiniWorldEnv):
         # Allow only the movement actions
         self.action_space = spaces.Discrete(self.actions.move_forward + 1)
 
-    def _gen_world(self):
-        # Top room
-        room0 = self.add_rect_room(min_x=-7, max_x=7, min_z=0.5, max_z=7)
-        # Bottom-left room
-        room1 = self.add_rect_room(min_x=-7, max_x=-1, min_z=-7, max_z=-0.5)
-        # Bottom-right room
-        room2 = self.add_rect_room(min_x=1, max_x=7, min_z=-7, max_z=-0.5)
+    def _gen_static_world(self):
+        rooms = self._add_rooms_from_array(ROOMS_DESC)
 
         # Connect the rooms with portals/openings
-        self.connect_rooms(room0, room1, min_x=-5.25, max_x=-2.75)
-        self.connect_rooms(room0, room2, min_x=2.75, max_x=5.25)
-
-        self.box = self.place_entity(Box(color="red"))
-        # self.yellow_box = self.place_entity(Box(color='yellow', size=[0.8, 1.2, 0.5]))
-        self.place_entity(Box(color="green", size=0.6))
+        self._connect_portals_from_array(rooms, PORTALS_DESC)
 
         # Mila logo image on the wall
         self.entities.append(
@@ -66,12 +80,21 @@ class ThreeRooms(MiniWorldEnv):
             )
         )
 
-        self.place_entity(MeshEnt(mesh_name="duckie", height=0.25, static=False))
-
-        self.place_entity(Key(color="blue"))
-        self.place_entity(Ball(color="green"))
-
-        self.place_agent()
+    def _gen_dynamic_world(self):
+        self.box = Box(color="red")
+
+        # Place the entities and the agent all at once
+        self._batch_place(
+            [
+                self.box,
+                # Box(color='yellow', size=[0.8, 1.2, 0.5]),
+                Box(color="green", size=0.6),
+                MeshEnt(mesh_name="duckie", height=0.25, static=False),
+                Key(color="blue"),
+                Ball(color="green"),
+                self.agent,
+            ]
+        )
 
     def step(self, action):
         obs, reward, termination, truncation, info = super().step(action)
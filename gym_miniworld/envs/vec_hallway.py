@@ -0,0 +1,69 @@
+from functools import partial
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+
+from gym_miniworld.envs.hallway import Hallway
+
+
+class VectorHallway(gym.vector.AsyncVectorEnv):
+    """
+    ## Description
+
+    Multiple copies of the Hallway environment stepped together,
+    each running in its own worker process. The observations of all
+    the copies are written by the workers directly into one contiguous
+    shared memory buffer, so frames are not pickled between processes.
+
+    The worker processes are started with the "spawn" method, so that they
+    don't inherit the pyglet window and OpenGL state of the parent process.
+    AsyncVectorEnv also creates one Hallway environment in the parent process,
+    which is closed right away.
+
+    ## Action Space
+
+    Batch of `num_envs` Hallway actions.
+
+    ## Observation Space
+
+    The observation space is an `ndarray` with shape
+    `(num_envs, obs_height, obs_width, 3)` holding the views of all the agents.
+
+    ## Arguments
+
+    ```python
+    VectorHallway(num_envs=4, length=12, copy=True)
+    ```
+
+    `num_envs`: number of Hallway environments
+
+    `copy`: if False, the observations returned are views into the shared
+    buffer, which get overwritten by the next call to reset or step
+
+    Other keyword arguments are passed on to each Hallway environment.
+
+    """
+
+    def __init__(self, num_envs=4, copy=True, obs_width=80, obs_height=60, **kwargs):
+        assert num_envs >= 1
+
+        env_fns = [
+            partial(Hallway, obs_width=obs_width, obs_height=obs_height, **kwargs)
+            for _ in range(num_envs)
+        ]
+
+        # Spaces of a single Hallway environment
+        observation_space = spaces.Box(
+            low=0, high=255, shape=(obs_height, obs_width, 3), dtype=np.uint8
+        )
+        action_space = spaces.Discrete(Hallway.Actions.move_forward + 1)
+
+        super().__init__(
+            env_fns,
+            observation_space=observation_space,
+            action_space=action_space,
+            shared_memory=True,
+            copy=copy,
+            context="spawn",
+        )
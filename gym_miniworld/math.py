@@ -60,3 +60,34 @@ def intersect_circle_segs(point, radius, segs):
 
     # No intersection
     return None
+
+
+def intersect_circles_segs(points, radii, segs):
+    """
+    Test which of multiple circles intersect with any wall segments
+    Returns a boolean array with one entry per circle
+    """
+
+    # Ignore Y coordinate
+    points = points * np.array([1, 0, 1])
+
+    a = segs[:, 0, :]
+    b = segs[:, 1, :]
+    ab = b - a
+    ap = np.expand_dims(points, axis=1) - a
+
+    dotAPAB = np.sum(ap * ab, axis=2)
+    dotABAB = np.sum(ab * ab, axis=1)
+
+    proj_dist = dotAPAB / dotABAB
+    proj_dist = np.clip(proj_dist, 0, 1)
+    proj_dist = np.expand_dims(proj_dist, axis=2)
+
+    # Compute the closest points on the segments
+    c = a + proj_dist * ab
+
+    # Check if any distances are within the radius of each circle
+    dist = np.linalg.norm(c - np.expand_dims(points, axis=1), axis=2)
+    dist_lt_rad = np.less(dist, np.expand_dims(radii, axis=1))
+
+    return np.any(dist_lt_rad, axis=1)
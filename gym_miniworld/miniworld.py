@@ -68,7 +68,7 @@ from pyglet.gl import (
 )
 
 from gym_miniworld.entity import Agent, Entity
-from gym_miniworld.math import Y_VEC, intersect_circle_segs
+from gym_miniworld.math import Y_VEC, intersect_circle_segs, intersect_circles_segs
 from gym_miniworld.opengl import FrameBuffer, Texture, drawBox
 from gym_miniworld.params import DEFAULT_PARAMS
 
@@ -283,6 +283,19 @@ class Room:
         # The point is inside if all the dot products are greater than zero
         return np.all(np.greater(dotNAP, 0))
 
+    def points_inside(self, ps):
+        """
+        Test which of multiple points (array of shape Nx3) are inside the room
+        """
+
+        # Vectors from edge starts to test points
+        ap = np.expand_dims(ps, axis=1) - self.outline
+
+        # Compute the dot products of normals to AP vectors
+        dotNAP = np.sum(self.edge_norms * ap, axis=2)
+
+        return np.all(np.greater(dotNAP, 0), axis=1)
+
     def _gen_static_data(self, params, rng):
         """
         Generate polygons and static data for this room
@@ -447,6 +460,10 @@ class MiniWorldEnv(gym.Env):
         "render_fps": 30,
     }
 
+    # Names of the textures loaded when the environment is created,
+    # before the first reset, rather than on first use
+    preload_tex = ()
+
     # Enumeration of possible actions
     class Actions(IntEnum):
         # Turn left or right by a small amount
@@ -538,6 +555,13 @@ class MiniWorldEnv(gym.Env):
             y=window_height - (self.obs_disp_height + 19),
         )
 
+        # Static rooms and entities reused across episodes,
+        # see _gen_static_world
+        self._static_cache = None
+
+        # Load the textures now that the OpenGL context exists
+        self._preload_textures(self.preload_tex)
+
         # Initialize the state
         self.reset()
 
@@ -751,6 +775,40 @@ class MiniWorldEnv(gym.Env):
 
         return self.add_room(outline=outline, **kwargs)
 
+    def _add_rooms_from_array(self, rooms_desc, **kwargs):
+        """
+        Create multiple rectangular rooms from an array with one row
+        (min_x, max_x, min_z, max_z) per room
+        """
+
+        rooms_desc = np.asarray(rooms_desc, dtype=float)
+        min_x, max_x, min_z, max_z = rooms_desc.T
+
+        # 2D outline coordinates of all the rooms, in the same
+        # counter-clockwise order as add_rect_room
+        outlines = np.stack(
+            [
+                np.stack([max_x, max_z], axis=1),
+                np.stack([max_x, min_z], axis=1),
+                np.stack([min_x, min_z], axis=1),
+                np.stack([min_x, max_z], axis=1),
+            ],
+            axis=1,
+        )
+
+        return [self.add_room(outline=outline, **kwargs) for outline in outlines]
+
+    def _connect_portals_from_array(self, rooms, portals_desc):
+        """
+        Connect rooms from an array with one row (room_a, room_b, min_x, max_x)
+        per portal, where room_a and room_b are indices into the rooms list
+        """
+
+        for idx_a, idx_b, min_x, max_x in np.asarray(portals_desc).tolist():
+            self.connect_rooms(
+                rooms[int(idx_a)], rooms[int(idx_b)], min_x=min_x, max_x=max_x
+            )
+
     def add_room(self, **kwargs):
         """
         Create a new room
@@ -908,6 +966,94 @@ class MiniWorldEnv(gym.Env):
 
         return ent
 
+    def _batch_place(self, ents):
+        """
+        Place multiple entities in the world at once, at random positions
+        that don't intersect with walls, other entities or each other.
+        Candidate positions for all the entities are sampled and tested
+        together, and only the rejected entities are sampled again.
+        The agent may be included in the list of entities.
+        """
+
+        assert len(self.rooms) > 0, "create rooms before calling _batch_place"
+        assert all(
+            ent.radius is not None for ent in ents
+        ), "entity must have physical size defined"
+
+        # Generate collision detection data
+        if len(self.wall_segs) == 0:
+            self._gen_static_data()
+
+        num_ents = len(ents)
+        radii = np.array([ent.radius for ent in ents], dtype=float)
+        poss = np.zeros((num_ents, 3))
+        placed = np.zeros(num_ents, dtype=bool)
+
+        # Positions and radii of the entities already in the world
+        if len(self.entities) > 0:
+            world_poss = np.array([ent.pos for ent in self.entities], dtype=float)
+            world_poss[:, 1] = 0
+            world_radii = np.array([ent.radius for ent in self.entities], dtype=float)
+        else:
+            world_poss = np.zeros((0, 3))
+            world_radii = np.zeros(0)
+
+        rooms = list(self.rooms)
+        room_min = np.array([[r.min_x, r.min_z] for r in rooms])
+        room_max = np.array([[r.max_x, r.max_z] for r in rooms])
+
+        # Keep retrying until all entities have a suitable position
+        while not np.all(placed):
+            idxs = np.flatnonzero(~placed)
+            r = radii[idxs]
+
+            # Pick rooms, sampled proportionally to floor surface area
+            room_idxs = self.np_random.choice(
+                len(rooms), size=len(idxs), p=self.room_probs
+            )
+
+            # Choose random points within the square bounding boxes of the rooms
+            xz = self.np_random.uniform(
+                low=room_min[room_idxs] - r[:, None],
+                high=room_max[room_idxs] + r[:, None],
+            )
+            pos = np.stack([xz[:, 0], np.zeros(len(idxs)), xz[:, 1]], axis=1)
+
+            # Make sure the positions are within the rooms' outlines
+            valid = np.zeros(len(idxs), dtype=bool)
+            for room_idx in np.unique(room_idxs):
+                in_room = room_idxs == room_idx
+                valid[in_room] = rooms[room_idx].points_inside(pos[in_room])
+
+            # Make sure the positions don't intersect with any walls
+            valid &= ~intersect_circles_segs(pos, r, self.wall_segs)
+
+            # Make sure the positions don't intersect with other entities,
+            # including the ones placed in previous iterations
+            other_poss = np.concatenate([world_poss, poss[placed]])
+            other_radii = np.concatenate([world_radii, radii[placed]])
+            dists = np.linalg.norm(pos[:, None] - other_poss[None], axis=2)
+            valid &= ~np.any(dists < r[:, None] + other_radii[None], axis=1)
+
+            # Among the new positions, a position is rejected if it intersects
+            # with a valid position of an entity earlier in the list
+            dists = np.linalg.norm(pos[:, None] - pos[None], axis=2)
+            overlap = np.triu(dists < r[:, None] + r[None], k=1)
+            valid &= ~np.any(overlap & valid[:, None], axis=0)
+
+            poss[idxs[valid]] = pos[valid]
+            placed[idxs[valid]] = True
+
+        # Pick directions
+        dirs = self.np_random.uniform(-math.pi, math.pi, size=num_ents)
+
+        for ent, pos, d in zip(ents, poss, dirs):
+            ent.pos = pos
+            ent.dir = d
+            self.entities.append(ent)
+
+        return ents
+
     def place_agent(
         self, room=None, dir=None, min_x=None, max_x=None, min_z=None, max_z=None
     ):
@@ -976,6 +1122,16 @@ class MiniWorldEnv(gym.Env):
         )
         return Texture.get(tex_name, rand)
 
+    @staticmethod
+    def _preload_textures(tex_names):
+        """
+        Load textures and their randomized versions ahead of time, so that
+        they don't get loaded from disk when resetting the environment
+        """
+
+        for tex_name in tex_names:
+            Texture.preload(tex_name)
+
     def _gen_static_data(self):
         """
         Generate static data needed for rendering and collision detection
@@ -996,7 +1152,47 @@ class MiniWorldEnv(gym.Env):
 
     def _gen_world(self):
         """
-        Generate the world. Derived classes must implement this method.
+        Generate the world. Derived classes must implement this method,
+        or alternatively implement _gen_static_world and _gen_dynamic_world.
+        """
+
+        # The static part of the world is generated only once,
+        # and then reused at the start of every episode
+        if self._static_cache is None:
+            self._gen_static_world()
+            self._gen_static_data()
+            self._static_cache = (
+                list(self.rooms),
+                list(self.entities),
+                self.wall_segs,
+                self.room_probs,
+            )
+        else:
+            rooms, entities, wall_segs, room_probs = self._static_cache
+            self.rooms = list(rooms)
+            self.entities = list(entities)
+
+            # With domain randomization, the static data is generated again
+            # so that the room textures get randomized
+            if not self.domain_rand:
+                self.wall_segs = wall_segs
+                self.room_probs = room_probs
+
+        self._gen_dynamic_world()
+
+    def _gen_static_world(self):
+        """
+        Generate the parts of the world that are the same in every episode:
+        rooms, portals and static entities. This must not depend on the
+        random number generator.
+        """
+
+        raise NotImplementedError
+
+    def _gen_dynamic_world(self):
+        """
+        Generate the parts of the world that change in every episode,
+        such as the placement of the agent and movable entities
         """
 
         raise NotImplementedError
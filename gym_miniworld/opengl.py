@@ -128,6 +128,8 @@ class Texture:
                     break
                 paths.append(path)
 
+            self.tex_paths[tex_name] = paths
+
         assert len(paths) > 0, ValueError(
             'failed to load textures for name "%s"' % tex_name
         )
@@ -139,10 +141,29 @@ class Texture:
         else:
             path = paths[0]
 
-        if path not in self.tex_cache:
-            self.tex_cache[path] = Texture(Texture.load(path), tex_name)
+        return self._load_cached(path, tex_name)
+
+    @classmethod
+    def preload(cls, tex_name):
+        """
+        Load all the randomized versions of a texture into the cache
+        """
+
+        cls.get(tex_name)
+
+        for path in cls.tex_paths[tex_name]:
+            cls._load_cached(path, tex_name)
+
+    @classmethod
+    def _load_cached(cls, path, tex_name):
+        """
+        Load a texture based on its path, or use a cached version
+        """
+
+        if path not in cls.tex_cache:
+            cls.tex_cache[path] = Texture(Texture.load(path), tex_name)
 
-        return self.tex_cache[path]
+        return cls.tex_cache[path]
 
     @classmethod
     def load(cls, tex_path):
@@ -1,13 +1,17 @@
 import importlib
+import json
 import math
+import threading
 import warnings
 
 import gymnasium as gym
+import numpy as np
 import pytest
 from gymnasium.utils.env_checker import check_env
 
 import gym_miniworld
 from gym_miniworld.entity import TextFrame
+from gym_miniworld.math import intersect_circle_segs
 from gym_miniworld.miniworld import MiniWorldEnv
 from gym_miniworld.wrappers import PyTorchObsWrapper
 
@@ -79,6 +83,128 @@ def test_collision_detection():
     env.close()
 
 
+def test_static_world_cache():
+    # The static rooms and entities should be generated once and reused
+    env = gym_miniworld.envs.ThreeRooms()
+    rooms = env.rooms
+    static_ents = [ent for ent in env.entities if ent.is_static]
+    wall_segs = env.wall_segs
+
+    for _ in range(5):
+        env.reset()
+        assert len(env.rooms) == len(rooms)
+        assert all(r0 is r1 for r0, r1 in zip(env.rooms, rooms))
+        assert [ent for ent in env.entities if ent.is_static] == static_ents
+        assert env.wall_segs is wall_segs
+        assert not env.intersect(env.agent, env.agent.pos, env.agent.radius)
+
+    # With domain randomization, the static data is regenerated
+    env.domain_rand = True
+    env.reset()
+    assert env.wall_segs is not wall_segs
+    assert np.array_equal(env.wall_segs, wall_segs)
+
+    env.close()
+
+
+def test_batch_place():
+    # Entities placed together must not intersect with walls or each other
+    env = gym_miniworld.envs.ThreeRooms()
+    for _ in range(30):
+        env.reset()
+        ents = [ent for ent in env.entities if not ent.is_static]
+        assert ents[-1] is env.agent
+        for i, ent in enumerate(ents):
+            assert any(room.point_inside(ent.pos) for room in env.rooms)
+            assert not intersect_circle_segs(ent.pos, ent.radius, env.wall_segs)
+            for ent2 in ents[i + 1 :]:
+                dist = np.linalg.norm(ent.pos - ent2.pos)
+                assert dist >= ent.radius + ent2.radius
+
+    env.close()
+
+
+def test_vector_hallway():
+    env = gym_miniworld.envs.VectorHallway(num_envs=2)
+    obs, info = env.reset(seed=0)
+    assert obs.shape == (2, 60, 80, 3)
+    assert obs.shape == env.observation_space.shape
+    for _ in range(10):
+        obs, reward, termination, truncation, info = env.step(env.action_space.sample())
+        assert obs.shape == (2, 60, 80, 3)
+        assert reward.shape == (2,)
+
+    env.close()
+
+
+def start_remotebot_server(framing="msgpack", codec="raw", dtype="uint8"):
+    # Fake robot server replying to each command with a frame filled with
+    # the frame number, which stops after being idle for a second
+    zmq = pytest.importorskip("zmq")
+    msgspec = pytest.importorskip("msgspec")
+    if codec == "lz4":
+        lz4 = pytest.importorskip("lz4.frame")
+    socket = zmq.Context.instance().socket(zmq.PAIR)
+    port = socket.bind_to_random_port("tcp://127.0.0.1")
+
+    def serve():
+        n = 0
+        while socket.poll(1000):
+            json.loads(socket.recv())
+            img = np.full((60, 80, 3), n, dtype=dtype)
+            md = {"dtype": str(img.dtype), "shape": img.shape}
+            data = img.tobytes()
+            if codec == "lz4":
+                md["codec"] = "lz4"
+                data = lz4.compress(data)
+            if framing == "json":
+                socket.send_json(md)
+                socket.send(data)
+            else:
+                socket.send_multipart([msgspec.msgpack.encode(md), data])
+            n += 1
+        socket.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return port
+
+
+@pytest.mark.parametrize(
+    "framing, codec", [("msgpack", "raw"), ("json", "raw"), ("msgpack", "lz4")]
+)
+def test_remotebot(framing, codec):
+    port = start_remotebot_server(framing, codec)
+    env = gym_miniworld.envs.RemoteBot(
+        serverAddr="127.0.0.1",
+        serverPort=port,
+        codec=None if codec == "raw" else codec,
+    )
+
+    # Check that the frames are received in order, the first frame is
+    # received by the reset in the constructor
+    obs, _ = env.reset()
+    assert obs.shape == (60, 80, 3) and obs[0, 0, 0] == 1
+    first_obs = obs
+    obs, _, _, _, _ = env.step(env.actions.move_forward)
+    assert obs[0, 0, 0] == 2 and first_obs[0, 0, 0] == 1
+    obs = env.step_batch([env.actions.move_forward] * 6)
+    assert list(obs[:, 0, 0, 0]) == [3, 4, 5, 6, 7, 8]
+    obs, _, _, _, _ = env.step(env.actions.turn_left)
+    assert obs[0, 0, 0] == 9
+
+    with pytest.raises(AssertionError):
+        env.step(-1)
+
+    env.close()
+
+
+def test_remotebot_recv_error():
+    # Errors in the receiver thread must be raised in the caller
+    port = start_remotebot_server(dtype="float32")
+    with pytest.raises(AssertionError, match="uint8"):
+        gym_miniworld.envs.RemoteBot(serverAddr="127.0.0.1", serverPort=port)
+
+
 @pytest.mark.parametrize("env_id", gym_miniworld.envs.env_ids)
 def test_all_envs(env_id):
     # Try loading each of the available environments